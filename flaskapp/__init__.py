@@ -3,10 +3,23 @@ from flask import Flask
 from flaskapp.config import DevelopmentConfig
 from flaskapp.home.routes import home
 
+try:
+    # orjson is optional: when it is installed, JSON is encoded and decoded
+    # with it instead of the standard library's json module
+    from flaskapp.json_provider import OrjsonProvider
+except ModuleNotFoundError as error:
+    # Anything else missing (e.g. flask.json.provider on a Flask older than
+    # 2.2) is a broken install, not a missing optional dependency
+    if error.name != "orjson":
+        raise
+    OrjsonProvider = None  # type: ignore[assignment,misc]
 
-def create_app():
+
+def create_app() -> Flask:
     app = Flask(__name__)
     app.config.from_object(DevelopmentConfig)
+    if OrjsonProvider is not None:
+        app.json = OrjsonProvider(app)
 
     app.register_blueprint(home)
 
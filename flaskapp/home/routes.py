@@ -1,5 +1,6 @@
-import copy
 import json
+import uuid
+from typing import Dict, Optional, Tuple
 
 from flask import Blueprint, jsonify, render_template, request
 from flaskapp.mcts.mcts import Board
@@ -7,6 +8,76 @@ from flaskapp.mcts.tictactoe import TicTacToe
 
 home = Blueprint("home", __name__)
 
+# The client sends its board with every move, so the server holds no state
+# a game needs: the game being played by each page is only cached here so
+# the MCTS search tree built for one move can be reused for the next. Games
+# are keyed by a random id which the page sends back with every move, and a
+# move whose game isn't cached (e.g. it reached another gunicorn worker, the
+# game was evicted, or the server was restarted) is simply played on a game
+# rebuilt from the client's board. Each game keeps its search tree, so the
+# oldest games are evicted once there are too many games or their trees hold
+# too many nodes in total (a 5x5 search of 20,000 iterations keeps ~80,000
+# nodes, roughly 30 MB).
+MAX_CACHED_GAMES = 100
+MAX_CACHED_NODES = 500_000
+games: Dict[str, TicTacToe] = {}
+
+# The largest number of MCTS iterations a request can ask for
+MAX_MCTS_ITERATIONS = 100_000
+
+
+def evict_games(keep_game_id: Optional[str] = None) -> None:
+    """Evicts the oldest games until the cached games are within the limits
+    (see MAX_CACHED_GAMES and MAX_CACHED_NODES).
+
+    Args:
+        keep_game_id (Optional[str], optional): The id of a game which isn't
+            evicted (e.g. the game being played). Defaults to None.
+    """
+    n_nodes = sum(game.mcts.tree_size for game in list(games.values()))
+    for game_id in list(games):
+        if len(games) <= MAX_CACHED_GAMES and n_nodes <= MAX_CACHED_NODES:
+            break
+        if game_id == keep_game_id:
+            continue
+        game = games.pop(game_id, None)
+        if game is not None:
+            n_nodes -= game.mcts.tree_size
+
+
+def get_game(game_id: str, board: Board) -> Tuple[str, TicTacToe]:
+    """Returns the game with the given id, playing on the given board (the
+    board the client shows).
+
+    The cached game is reused when it has the same board, and otherwise (e.g.
+    the game isn't cached) a game is rebuilt from the board, reusing the
+    cached game's search tree if there is one. The game is then cached under
+    its id, which is a new id for the client's first move.
+
+    Args:
+        game_id (str): The id of the game, or an empty string for a game
+            which hasn't been played yet.
+        board (Board): The board the client shows.
+
+    Returns:
+        Tuple[str, TicTacToe]: The id of the game (see games) and the game.
+    """
+    if not game_id:
+        game_id = uuid.uuid4().hex
+    game = games.pop(game_id, None)
+    if game is None:
+        game = TicTacToe(board=board)
+    elif (game.board.player_mask, game.board.ai_mask, game.board.size) != (
+        board.player_mask,
+        board.ai_mask,
+        board.size,
+    ):
+        game = TicTacToe(board=board, mcts=game.mcts)
+    # (Re)inserting the game moves it to the end of the cache, so the least
+    # recently played games are evicted first
+    games[game_id] = game
+    return game_id, game
+
 
 @home.route("/", methods=["GET", "POST"])
 def homepage():
@@ -22,6 +93,8 @@ def board():
         if "board_size" not in request.form
         else int(request.form["board_size"])
     )
+    # The page's previous game can't be played any more
+    games.pop(request.form.get("game_id", ""), None)
     return render_template(
         "board.html", board_state=Board(board_size=board_size).state
     )
@@ -29,7 +102,6 @@ def board():
 
 @home.route("/play", methods=["GET", "POST"])
 def play():
-    game_state_message = None
     board_size = (
         None
         if "board_size" not in request.form
@@ -38,25 +110,44 @@ def play():
     mcts_iterations = (
         1000
         if "mcts_iterations" not in request.form
-        else int(request.form["mcts_iterations"])
+        else min(
+            max(int(request.form["mcts_iterations"]), 1), MAX_MCTS_ITERATIONS
+        )
     )
 
-    board_state = json.loads(request.form["board_state"])
+    game_id = request.form.get("game_id", "")
+    if "cell" not in request.form:
+        # Reset: the next move starts a new game
+        games.pop(game_id, None)
+        return jsonify(
+            {"game_id": "", "ai_cell": None, "game_state_message": None}
+        )
 
-    if board_state is None:
-        ttt_board = Board(board_size=board_size)
-    else:
-        ttt_board = Board(state=board_state, board_size=board_size)
-
-    if "cell" in request.form:
-        cell = int(request.form["cell"])
-        ttt = TicTacToe(board=ttt_board)
-        ttt.play(player_position=cell, iterations=mcts_iterations)
-        ttt_board = ttt.board
-        game_state_message = ttt.game_state_msg
-    else:
-        ttt_board = copy.deepcopy(Board(board_size=board_size))
+    game_id, ttt = get_game(
+        game_id,
+        Board(
+            state=json.loads(request.form["board_state"]),
+            board_size=board_size,
+        ),
+    )
+    ai_cell = None
+    ai_action = ttt.play(
+        player_position=int(request.form["cell"]),
+        iterations=mcts_iterations,
+        use_mcts=request.form.get("use_mcts") == "true",
+    )
+    if ai_action is not None:
+        row, col = ai_action
+        ai_cell = row * ttt.board.size + col + 1
+    # The game's search tree has grown (or was dropped if the game is over)
+    evict_games(keep_game_id=game_id)
 
+    # Only the AI's move is returned, as the client already shows the rest of
+    # the board
     return jsonify(
-        {"board": ttt_board.state, "game_state_message": game_state_message}
+        {
+            "game_id": game_id,
+            "ai_cell": ai_cell,
+            "game_state_message": ttt.game_state_msg,
+        }
     )
@@ -0,0 +1,40 @@
+from typing import Any, Union
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider which encodes and decodes JSON with orjson instead of the
+    standard library's json module (e.g. for jsonify responses)"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serializes the given data as a JSON string.
+
+        Only the options Flask itself passes (indent and sort_keys) are
+        supported, and indentation is always 2 spaces. Non-str dict keys are
+        converted to strings, as the standard library's json module does.
+
+        Args:
+            obj (Any): The data to serialize.
+
+        Returns:
+            str: The JSON string.
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserializes the given JSON string.
+
+        Args:
+            s (Union[str, bytes]): The JSON string.
+
+        Returns:
+            Any: The deserialized data.
+        """
+        return orjson.loads(s)
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Tuple
+
+import flaskapp.mcts.utils as utils
+from flaskapp.mcts.mcts import Board
+
+
+class AlphaBetaSearch:
+    """Alpha-beta search class which solves small Tic-Tac-Toe boards exactly"""
+
+    # Boards larger than this have too many positions to solve per move, so
+    # they are left to MonteCarloTreeSearch
+    MAX_BOARD_SIZE: int = 3
+
+    def find_best_move(
+        self, board: Board, player: int = -1
+    ) -> Tuple[int, int]:
+        """Finds the optimal move for the given player from the board's
+        current state using negamax search with alpha-beta pruning.
+
+        Positions are memoized across calls (see _negamax), so after the first
+        search of a game most moves are answered from the cache.
+
+        Args:
+            board (Board): The board to find the best move for.
+            player (int, optional): The player to move. Defaults to -1 (AI).
+
+        Returns:
+            Tuple[int, int]: The (row, column) action to take.
+
+        Raises:
+            ValueError: If the game is already over (see solve).
+        """
+        action, _ = solve(
+            board.player_mask, board.ai_mask, player, board.board_size
+        )
+        return action
+
+
+def solve(
+    player_mask: int, ai_mask: int, player: int, board_size: int
+) -> Tuple[Tuple[int, int], int]:
+    """Returns the best action for the player to move and its value.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        player (int): The player to move (1 for the player, -1 for the AI).
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[Tuple[int, int], int]: The (row, column) action to take and the
+            value of the position for the player to move (see _negamax).
+
+    Raises:
+        ValueError: If the game is already over (there is no move to play).
+    """
+    if utils.get_game_state(player_mask, ai_mask, board_size) is not None:
+        raise ValueError("The game is over, so there is no move to play")
+    occupied = player_mask | ai_mask
+    alpha = -(board_size * board_size + 1)
+    beta = -alpha
+    best_bit = 0
+    for bit in utils.get_move_order(board_size):
+        if occupied & bit:
+            continue
+        if player == 1:
+            value = -_negamax(
+                player_mask | bit, ai_mask, -1, -beta, -alpha, board_size
+            )
+        else:
+            value = -_negamax(
+                player_mask, ai_mask | bit, 1, -beta, -alpha, board_size
+            )
+        if value > alpha:
+            alpha = value
+            best_bit = bit
+    return divmod(best_bit.bit_length() - 1, board_size), alpha
+
+
+@lru_cache(maxsize=None)
+def _negamax(
+    player_mask: int,
+    ai_mask: int,
+    player: int,
+    alpha: int,
+    beta: int,
+    board_size: int,
+) -> int:
+    """Returns the value of a position for the player to move, clamped to the
+    (alpha, beta) search window.
+
+    A won game is worth (number of empty cells + 1), so quicker wins (and
+    slower losses) are preferred, and a tie is worth 0. The search window is
+    part of the cache key, so cached values stay exact for the window they
+    were searched with.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        player (int): The player to move (1 for the player, -1 for the AI).
+        alpha (int): The value the player to move is already assured of.
+        beta (int): The value the opponent is already assured of.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        int: The value of the position for the player to move.
+    """
+    occupied = player_mask | ai_mask
+    game_state = utils.get_game_state(player_mask, ai_mask, board_size)
+    if game_state is not None:
+        empty = ~occupied & utils.get_full_mask(board_size)
+        return game_state * player * (utils.count_set_bits(empty) + 1)
+
+    # Moves are searched strongest first (see utils.get_move_order), so
+    # cutoffs happen as early as possible
+    for bit in utils.get_move_order(board_size):
+        if occupied & bit:
+            continue
+        if player == 1:
+            value = -_negamax(
+                player_mask | bit, ai_mask, -1, -beta, -alpha, board_size
+            )
+        else:
+            value = -_negamax(
+                player_mask, ai_mask | bit, 1, -beta, -alpha, board_size
+            )
+        if value > alpha:
+            alpha = value
+            # The opponent will never allow this position, so the remaining
+            # moves don't need to be searched
+            if alpha >= beta:
+                break
+    return alpha
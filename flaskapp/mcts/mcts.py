@@ -1,45 +1,201 @@
-import copy
+import atexit
+import math
+import multiprocessing
+import multiprocessing.pool
 import random
-from typing import List, Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 
 import flaskapp.mcts.utils as utils
 from tqdm import tqdm
 
+try:
+    # numba is optional: when it is installed, rollouts run in a
+    # JIT-compiled kernel instead of the pure Python loop
+    from flaskapp.mcts import rollout_numba
+except ModuleNotFoundError as error:
+    # Anything else failing to import (e.g. a numba built for another numpy)
+    # is a broken install, not a missing optional dependency
+    if error.name != "numba":
+        raise
+    rollout_numba = None  # type: ignore[assignment]
+
+
+# How each player's cells are printed (see Board.print_board)
+PLAYER_SYMBOLS: Dict[int, str] = {
+    1: "\033[92m o\033[0;0m",
+    -1: "\033[91m x\033[0;0m",
+}
+
 
 class MonteCarloTreeSearch:
     """Monte Carlo Tree Search class"""
 
+    # The best moves found so far, shared by every search (i.e. across games
+    # and requests), keyed by the canonical form of the searched position and
+    # the search parameters. The oldest entry is evicted once the cache is
+    # full. Searches can run in several threads at once (e.g. in the threaded
+    # Flask server), so the cache is only updated while holding the lock.
+    BEST_MOVE_CACHE_SIZE: int = 10_000
+    _best_move_cache: Dict[Tuple[int, ...], int] = {}
+    _best_move_cache_lock = threading.Lock()
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        """Initializes a new search with no search tree.
+
+        The same MonteCarloTreeSearch should be used for every move of a game,
+        so each search can reuse the part of the previous search tree which
+        is still reachable (see _get_root_node).
+
+        Args:
+            seed (Optional[int], optional): The seed for the search's random
+                number generator, to make searches repeatable (the numba
+                rollouts are seeded from this generator too). Defaults to None
+                (unseeded).
+        """
+        # Each search draws from its own generator rather than the random
+        # module's shared one, so independent searches (e.g. the workers of
+        # a parallel search, or the searches of concurrent requests) get
+        # independent streams
+        self.rng = random.Random(seed)
+        # Every node of the search tree, keyed by its (player_mask, ai_mask)
+        # bitboards. The same position can be reached by playing the same
+        # moves in a different order, and those paths share a single node
+        # (and its statistics) rather than searching the position twice
+        self.transpositions: Dict[Tuple[int, int], "Node"] = {}
+
+    @property
+    def tree_size(self) -> int:
+        """Returns the number of nodes in the search tree
+
+        Returns:
+            int: The number of nodes kept for the next search.
+        """
+        return len(self.transpositions)
+
+    def clear_search_tree(self) -> None:
+        """Discards the search tree (e.g. once the game has finished), freeing
+        its nodes."""
+        self.transpositions = {}
+
     def find_best_move(
-        self, board: "Board", iterations: int = 1_000
+        self,
+        board: "Board",
+        iterations: int = 1_000,
+        rollouts_per_leaf: int = 1,
+        n_workers: int = 1,
+        show_progress: bool = False,
     ) -> Tuple[int, int]:
         """Given a number of MCTS iterations to run, find the best possible
         move from the tree's current root node and return the action to take.
 
-        A new root node is constructed and initialized with the board state
-        provided. The board state can be initialized to any starting point, and
-        is iteratively updated during the game so the MCTS algorithm can find
-        the best action from the current board state.
+        A root node is initialized with the board state provided (reusing the
+        matching node of the previous search tree, if there is one). The board
+        state can be initialized to any starting point, and is iteratively
+        updated during the game so the MCTS algorithm can find the best action
+        from the current board state.
 
         The current player is initialized to 1 (human player) as it is assumed
         the AI (-1) has already played, but this can be configured.
 
+        Positions which are rotations or reflections of each other have the
+        same best move (up to that symmetry), so the result is cached by the
+        canonical form of the position (see utils.get_canonical_masks) and
+        repeated searches of a position, or any of its symmetries, are skipped.
+
         Args:
             board (Board): The board to provide to the root node of the search
                 tree.
             iterations (int, optional): The number of MCTS iterations. Defaults
                 to 1_000.
+            rollouts_per_leaf (int, optional): The number of rollouts to
+                perform from the selected leaf node in each iteration (the
+                rollouts are run in parallel when numba is installed).
+                Defaults to 1.
+            n_workers (int, optional): The number of processes to search
+                with. When greater than 1, each process searches its own tree
+                with an equal share of the iterations and the root visit counts
+                are summed (root parallelization, see _search_in_parallel).
+                The workers are spawned, so a script searching with several
+                workers needs an if __name__ == "__main__" guard. Defaults to
+                1.
+            show_progress (bool, optional): Whether to show a progress bar
+                of the iterations (single process searches only). Defaults to
+                False.
 
         Returns:
             Tuple[int, int]: The (row, column) action to take.
         """
-        self.root_node = Node(board=board, player=1)
+        board_size = board.board_size
+        canonical_player_mask, canonical_ai_mask, symmetry = (
+            utils.get_canonical_masks(
+                board.player_mask, board.ai_mask, board_size
+            )
+        )
+        cache_key = (
+            canonical_player_mask,
+            canonical_ai_mask,
+            board_size,
+            iterations,
+            rollouts_per_leaf,
+            n_workers,
+        )
+        cached_cell = self._best_move_cache.get(cache_key)
+        if cached_cell is not None:
+            # Map the cached move back from the canonical board
+            return divmod(symmetry.index(cached_cell), board_size)
+
+        if n_workers > 1:
+            # The workers' trees stay in the worker processes, so this search
+            # adds nothing to the search tree reused by later searches
+            (row, col) = self._search_in_parallel(
+                board, iterations, rollouts_per_leaf, n_workers
+            )
+        else:
+            root_node = self._get_root_node(board)
+            self._search(
+                root_node, iterations, rollouts_per_leaf, show_progress
+            )
+
+            # Get the node with the largest number of visits and the action
+            node_to_choose = self._get_child_node_with_max_visits(root_node)
+            (row, col) = root_node.get_action(node_to_choose)
+
+        with self._best_move_cache_lock:
+            if len(self._best_move_cache) >= self.BEST_MOVE_CACHE_SIZE:
+                del self._best_move_cache[next(iter(self._best_move_cache))]
+            self._best_move_cache[cache_key] = symmetry[row * board_size + col]
+        return (row, col)
+
+    def _search(
+        self,
+        root_node: "Node",
+        iterations: int,
+        rollouts_per_leaf: int = 1,
+        show_progress: bool = False,
+    ) -> None:
+        """Runs the given number of MCTS iterations from the given root node,
+        growing its search tree.
 
+        Args:
+            root_node (Node): The root node of the search tree.
+            iterations (int): The number of MCTS iterations.
+            rollouts_per_leaf (int, optional): The number of rollouts to
+                perform from the selected leaf node in each iteration. Defaults
+                to 1.
+            show_progress (bool, optional): Whether to show a progress bar.
+                Defaults to False.
+        """
         # Start by expanding the root node
-        self._expand(self.root_node)
+        if not root_node.children:
+            self._expand(root_node)
+        if len(root_node.children) == 1:
+            # The move is forced (see _expand), so there is nothing to search
+            return
 
-        for _ in tqdm(range(iterations)):
+        for _ in tqdm(range(iterations), disable=not show_progress):
             # Selection phase: select the most promising leaf node
-            selected_node = self._select()
+            selected_node = self._select(root_node)
 
             # Expansion phase: expand the most promising node which has already
             # been visited and is not a terminal state
@@ -58,104 +214,277 @@ class MonteCarloTreeSearch:
             # been visited yet or for terminal states
             # Backpropagation phase: backpropagate the results from the rollout
             # up the tree
-            result = self._rollout(selected_node)
-            self._backpropagate(selected_node, result)
+            value = self._rollout(selected_node, rollouts_per_leaf)
+            self._backpropagate(selected_node, value, rollouts_per_leaf)
 
-        # Get the node with the largest number of visits and the action
-        node_to_choose = self._get_child_node_with_max_visits()
-        return node_to_choose.action
+    def _search_in_parallel(
+        self,
+        board: "Board",
+        iterations: int,
+        rollouts_per_leaf: int,
+        n_workers: int,
+    ) -> Tuple[int, int]:
+        """Searches the given board with independent trees in n_workers
+        processes and returns the action with the most visits summed across
+        the trees.
 
-    def _select(self) -> "Node":
+        Each process gets an equal share of the iterations and its own random
+        seed (drawn from this search's generator, so a seeded search is still
+        repeatable). The worker processes are started by the first parallel
+        search and kept for later ones (see _get_worker_pool).
+
+        Args:
+            board (Board): The board to search from.
+            iterations (int): The total number of MCTS iterations.
+            rollouts_per_leaf (int): The number of rollouts to perform from
+                the selected leaf node in each iteration.
+            n_workers (int): The number of processes to search with.
+
+        Returns:
+            Tuple[int, int]: The (row, column) action to take.
+        """
+        worker_args = [
+            (
+                board.player_mask,
+                board.ai_mask,
+                board.board_size,
+                iterations // n_workers + (worker < iterations % n_workers),
+                rollouts_per_leaf,
+                self.rng.getrandbits(32),
+            )
+            for worker in range(n_workers)
+        ]
+        worker_visits = _get_worker_pool(n_workers).starmap(
+            _get_root_visits, worker_args
+        )
+
+        visits: Dict[Tuple[int, int], int] = {}
+        for action_visits in worker_visits:
+            for action, n in action_visits.items():
+                visits[action] = visits.get(action, 0) + n
+        return max(visits, key=visits.__getitem__)
+
+    def _get_root_node(self, board: "Board") -> "Node":
+        """Returns the root node to search from for the given board.
+
+        Between two searches the AI plays the chosen move and the player
+        replies, so the board is normally already in the previous search tree.
+        That node (and the statistics of its subtree) is reused as the new
+        root, and the nodes which can no longer be reached from it are
+        discarded. Otherwise a new root node is created.
+
+        Args:
+            board (Board): The board to search from.
+
+        Returns:
+            Node: The root node for the board.
+        """
+        player_mask = board.player_mask
+        ai_mask = board.ai_mask
+        root_node = self.transpositions.get((player_mask, ai_mask))
+        if root_node is None or root_node.player != 1:
+            root_node = Node.from_board(board, player=1)
+            self.transpositions = {(player_mask, ai_mask): root_node}
+            return root_node
+
+        # Only positions which keep every move played so far are reachable
+        self.transpositions = {
+            position: node
+            for position, node in self.transpositions.items()
+            if position[0] & player_mask == player_mask
+            and position[1] & ai_mask == ai_mask
+        }
+        root_node.parent = None
+        return root_node
+
+    def _select(self, root_node: "Node") -> "Node":
         """Performs the selection phase of the MCTS algorithm.
 
-        This method traverses the search tree to find the child node with the
-        largest UCT score.
+        This method traverses the search tree from the given root node to find
+        the child node with the largest UCT score.
         If multiple child nodes of a given node have the same UCT score, the
         first node is returned.
         If a node has no children (i.e. it hasn't been expanded yet) then
         return this node ready for expansion.
 
+        A node can have several parents (see transpositions), so each node on
+        the way down records the parent it was reached from, which is the
+        path _backpropagate walks back up.
+
+        Args:
+            root_node (Node): The root node of the search tree.
+
         Returns:
             Node: The node having the largest UCT score.
         """
-        node = self.root_node
+        node = root_node
         while node.children:
-            for child_node in node.children:
-                child_node.uct = utils.calculate_uct(child_node, node)
-            node = max(node.children, key=lambda child_node: child_node.uct)
+            # Unvisited children score infinity, so the first one would be
+            # selected anyway without scoring the rest
+            child_inv_ns = node.child_inv_ns
+            if 0.0 in child_inv_ns:
+                index = child_inv_ns.index(0.0)
+            else:
+                # ln(n_p) is shared by all the children. A transposed node can
+                # be reached for the first time after all its children were
+                # visited through other parents, so n_p can still be 0
+                uct_scores = utils.calculate_uct_scores(
+                    node.child_means, child_inv_ns, math.log(max(node.n, 1))
+                )
+                index = uct_scores.index(max(uct_scores))
+            child_node = node.children[index]
+            child_node.parent = node
+            child_node.index = index
+            node = child_node
         return node
 
     def _expand(self, node: "Node") -> None:
         """Performs the expansion phase of the MCTS algorithm.
 
-        This method creates new child nodes for all possible actions you can
-        take from the given node, where each child node contains the new state
-        of the board after each action was taken.
+        This method adds a child node for every possible action you can take
+        from the given node, where each child node contains the new state of
+        the board after the action was taken. A child whose position is
+        already in the search tree (reached by another order of moves) reuses
+        that node rather than creating a new one.
+
+        Forced moves are expanded on their own: if the player to move can win
+        immediately, only the winning move is added, and otherwise if the
+        opponent threatens to win on their next move, only the blocking move
+        is added (every other move loses).
 
         Args:
             node (Node): The node to expand.
         """
+        transpositions = self.transpositions
         next_player = -node.player
-        for available_action in node.board.get_available_actions():
-            (row, col) = available_action
-            parent_board_state = copy.deepcopy(node.board.state)
-            new_board = Board(state=parent_board_state)
-            new_board.play_move(row, col, next_player)
-            new_child_node = Node(
-                board=new_board, parent=node, player=next_player
-            )
-            new_child_node.action = available_action
-            node.add_child(new_child_node)
-
-    def _rollout(self, node: "Node") -> int:
+        board_size = node.board_size
+        player_mask = node.player_mask
+        ai_mask = node.ai_mask
+        empty = ~(player_mask | ai_mask) & utils.get_full_mask(board_size)
+        if next_player == 1:
+            mover_mask, opponent_mask = player_mask, ai_mask
+        else:
+            mover_mask, opponent_mask = ai_mask, player_mask
+        forced_bit = utils.get_winning_bit(
+            mover_mask, empty, board_size
+        ) or utils.get_winning_bit(opponent_mask, empty, board_size)
+        for bit in [forced_bit] if forced_bit else utils.get_set_bits(empty):
+            if next_player == 1:
+                position = (player_mask | bit, ai_mask)
+            else:
+                position = (player_mask, ai_mask | bit)
+            child_node = transpositions.get(position)
+            if child_node is None:
+                child_node = Node(*position, board_size, next_player)
+                transpositions[position] = child_node
+            node.add_child(child_node)
+
+    def _rollout(self, node: "Node", n_rollouts: int = 1) -> int:
         """Performs the simulation phase of the MCTS algorithm.
 
-        This method performs a simulation ('rollout') of the given node's board
-        until a terminal state is reached by alternating between player and AI
-        moves. Moves are drawn uniformly at random.
+        This method performs n_rollouts simulations ('rollouts') of the given
+        node's board until a terminal state is reached by alternating between
+        player and AI moves. Moves are drawn uniformly at random.
 
-        Once a terminal state is reached, the node's number of visits and
-        accumulated values are updated accordingly (+1 for number of visits,
-        +1/-1 depending on if the current player ending up winning/losing the
-        result of the rollout respectively).
+        The result of each rollout is scored from the perspective of the
+        node's player (+1/-1 depending on if the node's player ended up
+        winning/losing the rollout respectively, 0 for a tie) and the scores
+        are summed, ready to be backpropagated.
 
         Args:
-            node (Node): The node to perform a rollout for.
+            node (Node): The node to perform the rollouts for.
+            n_rollouts (int, optional): The number of rollouts to perform.
+                Defaults to 1.
 
         Returns:
-            int: the state of the game board (see board.game_state).
+            int: the summed result of the rollouts for the node's player.
         """
-        # If the node is a terminal state, we simply return the value of that
-        # state and backpropagate it up the tree
-        game_state = node.board.game_state
-        if node.is_terminal:
-            if game_state == 0:
-                return 0
-            elif node.player == game_state:
-                return 1
-            else:
-                return -1
+        # If the node is a terminal state, every rollout ends immediately with
+        # the value of that state
+        game_state = node.game_state
+        if game_state is not None:
+            return n_rollouts * node.player * game_state
+
+        player_mask = node.player_mask
+        ai_mask = node.ai_mask
+        board_size = node.board_size
+        if rollout_numba is not None:
+            # The kernels draw from their own generators, which are seeded
+            # from this search's generator so seeded searches are repeatable
+            total = rollout_numba.batch_rollout(
+                player_mask,
+                ai_mask,
+                -node.player,
+                board_size,
+                n_rollouts,
+                self.rng.getrandbits(62),
+            )
+        else:
+            total = sum(
+                self._play_out(player_mask, ai_mask, -node.player, board_size)
+                for _ in range(n_rollouts)
+            )
+        return node.player * total
 
-        cur_board = copy.deepcopy(node.board)
-        cur_player = node.player
+    def _play_out(
+        self, player_mask: int, ai_mask: int, player: int, board_size: int
+    ) -> int:
+        """Plays random moves from the given bitboards until the game ends.
 
-        while True:
-            cur_player = -cur_player
+        The game is played out on local copies of the bitboards, so no Board
+        needs to be created for the rollout.
 
-            # Check if the game is in a terminal state (see the
-            # Board.is_complete property)
-            if cur_board.is_complete:
-                break
+        Args:
+            player_mask (int): The bitboard of cells held by the player.
+            ai_mask (int): The bitboard of cells held by the AI.
+            player (int): The player to move first.
+            board_size (int): The size of the board (e.g. 3 for a 3x3 board).
 
-            # Alternate between players, taking random actions until a terminal
-            # state is reached
-            available_actions = cur_board.get_available_actions()
-            (row, col) = random.choice(available_actions)
-            cur_board.play_move(row, col, cur_player)
+        Returns:
+            int: the state of the game board at the end of the game (see
+                Board.game_state).
+        """
+        game_state = utils.get_game_state(player_mask, ai_mask, board_size)
+        if game_state is not None:
+            return game_state
+
+        empty = ~(player_mask | ai_mask) & utils.get_full_mask(board_size)
+        empty_bits = utils.get_set_bits(empty)
+        n_empty = len(empty_bits)
+        cell_win_masks = utils.get_cell_win_masks(board_size)
+        cur_player = player
+        # rng.random is bound once, and int(rand() * n) skips the argument
+        # checks rng.randrange(n) makes on every call
+        rand = self.rng.random
 
-        return cur_board.game_state
+        while True:
+            # Alternate between players, taking random actions until a terminal
+            # state is reached. The chosen cell is overwritten by the last
+            # empty cell, so the first n_empty bits are always the empty cells
+            # and nothing is rebuilt or shifted per move
+            index = int(rand() * n_empty)
+            n_empty -= 1
+            bit = empty_bits[index]
+            empty_bits[index] = empty_bits[n_empty]
+
+            # Only the lines through the cell just played can have been
+            # completed, and only by the player who played it
+            if cur_player == 1:
+                player_mask |= bit
+                mover_mask = player_mask
+            else:
+                ai_mask |= bit
+                mover_mask = ai_mask
+            for win_mask in cell_win_masks[bit.bit_length() - 1]:
+                if mover_mask & win_mask == win_mask:
+                    return cur_player
+            if not n_empty:
+                return 0
+            cur_player = -cur_player
 
-    def _backpropagate(self, node: "Node", result: int) -> None:
+    def _backpropagate(
+        self, node: "Node", value: int, visits: int = 1
+    ) -> None:
         """Performs the backpropagation phase of the MCTS algorithm.
 
         This method iteratively updates the values of n_i and w_i up the tree
@@ -164,68 +493,131 @@ class MonteCarloTreeSearch:
         Args:
             node (Node): The node containing the child nodes to backpropagate
                 their values up the tree.
-            result (int): The result of the game from the rollout phase (i.e.
-                the game state).
+            value (int): The summed result of the rollouts from the node's
+                player's perspective (see _rollout).
+            visits (int, optional): The number of rollouts performed from the
+                node. Defaults to 1.
         """
-        # Update w_i and n_i for this node based on the result of the game
-        node.n += 1
+        # Update w_i and n_i for this node and each parent node up to the
+        # root. The players alternate down the tree, so the value alternates
+        # sign (+value for this node, -value for its parent, +value for the
+        # next parent etc.). The new n and w are kept in locals, so each is
+        # only read from the node once
+        while True:
+            n = node.n = node.n + visits
+            w = node.w = node.w + value
+            parent_node = node.parent
+            if parent_node is None:
+                break
+            index = node.index
+            parent_node.child_means[index] = w / n
+            parent_node.child_inv_ns[index] = 1.0 / n
+            value = -value
+            node = parent_node
 
-        if node.is_terminal:
-            node.w += 1
-        else:
-            if node.player == result:
-                node.w += 1
-            elif result != 0:
-                node.w -= 1
-
-        # For each parent node of this node, update the values of n_i and w_i
-        # up to the root
-        parent_node = node.parent
-        sign = -1
-        while parent_node is not None:
-            parent_node.n += 1
-            # If the rollout result wasn't a tie
-            if result != 0:
-                # If the node we rolled out from was a terminal state, or the
-                # node we rollout out from had a game result equal to the
-                # player that played the move in that node
-                if node.is_terminal or node.player == result:
-                    # Start by decreasing the parent's w_i by 1, because the
-                    # rolled out node will always have a +1 score if we reach
-                    # here (i.e. rolled out to an AI win from an AI move, or
-                    # rolled out to a player win from a player move, or the
-                    # game state of the terminal node is equal to the terminal
-                    # node player)
-                    # For each parent, we alternate the sign (-1 for first
-                    # parent, +1 for next parent, -1 for next parent etc.)
-                    parent_node.w = parent_node.w + (1 * sign)
-                    sign = -sign
-                else:
-                    # Start by increasing the parent's w_i by 1, because the
-                    # player in the rolled out node at this point will not be
-                    # equal to the result of the game, so start by decreasing
-                    # the parent by 1, then increase the next parent by 1,
-                    # then decrease the next parent by 1 (etc.)
-                    # Again we alternate the sign to update w_i correctly
-                    sign = -sign
-                    parent_node.w = parent_node.w + (1 * sign)
-
-            parent_node = parent_node.parent
-
-    def _get_child_node_with_max_visits(self) -> "Node":
+    def _get_child_node_with_max_visits(self, root_node: "Node") -> "Node":
         """Returns the child node with the largest number of visits (n_i) from
-        the current tree's root node
+        the given root node
+
+        Args:
+            root_node (Node): The root node of the search tree.
 
         Returns:
             Node: The child node with the largest number of visits (n_i).
         """
-        return max(
-            self.root_node.children, key=lambda child_node: child_node.n
-        )
+        return max(root_node.children, key=lambda child_node: child_node.n)
+
+
+# The worker pool for each number of workers, kept between parallel searches
+# so the worker processes are only started once (they are closed when the
+# interpreter exits, see _close_worker_pools). Searches can run in
+# several threads at once (e.g. in the threaded Flask server), so the pools
+# are only looked up and started while holding the lock, and the workers are
+# spawned rather than forked, as forking a process with other threads
+# running can copy locks they hold
+_worker_pools: Dict[int, multiprocessing.pool.Pool] = {}
+_worker_pools_lock = threading.Lock()
+
+
+def _get_worker_pool(n_workers: int) -> multiprocessing.pool.Pool:
+    """Returns the worker pool for parallel searches with the given number of
+    workers, starting it on first use.
+
+    Args:
+        n_workers (int): The number of worker processes.
+
+    Returns:
+        multiprocessing.pool.Pool: The worker pool.
+    """
+    with _worker_pools_lock:
+        pool = _worker_pools.get(n_workers)
+        if pool is None:
+            pool = _worker_pools[n_workers] = multiprocessing.get_context(
+                "spawn"
+            ).Pool(n_workers)
+    return pool
+
+
+@atexit.register
+def _close_worker_pools() -> None:
+    """Closes the worker pools (see _worker_pools) and waits for their
+    workers to exit, while the interpreter can still shut them down
+    cleanly."""
+    with _worker_pools_lock:
+        for pool in _worker_pools.values():
+            pool.close()
+            pool.join()
+        _worker_pools.clear()
+
+
+def _get_root_visits(
+    player_mask: int,
+    ai_mask: int,
+    board_size: int,
+    iterations: int,
+    rollouts_per_leaf: int,
+    seed: int,
+) -> Dict[Tuple[int, int], int]:
+    """Searches a new tree from the given bitboards and returns the visit
+    count of each of the root's actions (run in a worker process by
+    MonteCarloTreeSearch._search_in_parallel).
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+        iterations (int): The number of MCTS iterations.
+        rollouts_per_leaf (int): The number of rollouts to perform from the
+            selected leaf node in each iteration.
+        seed (int): The seed for this worker's random numbers.
+
+    Returns:
+        Dict[Tuple[int, int], int]: The number of visits of each action.
+    """
+    # Each worker is seeded from the parent search's generator, so the
+    # workers search differently and a seeded search is still repeatable
+    root_node = Node(player_mask, ai_mask, board_size, player=1)
+    MonteCarloTreeSearch(seed=seed)._search(
+        root_node, iterations, rollouts_per_leaf
+    )
+    return {
+        root_node.get_action(child_node): child_node.n
+        for child_node in root_node.children
+    }
 
 
 class Board:
-    """Board class which represents a simple 3x3 Tic-Tac-Toe board"""
+    """Board class which represents a Tic-Tac-Toe board.
+
+    The board is stored as two bitboards: one integer mask for the cells held
+    by the player and one for the cells held by the AI, where cell (row, col)
+    is stored at bit (row * board_size + col). Copying a board is then just a
+    copy of two integers, and win detection is a handful of mask checks.
+    """
+
+    # Boards store their attributes in slots rather than a per-instance
+    # __dict__, which makes them smaller and faster to create
+    __slots__ = ("board_size", "player_mask", "ai_mask", "_game_state")
 
     DEFAULT_BOARD_SIZE: int = 3
 
@@ -255,13 +647,59 @@ class Board:
             board_size (int): The size of the board (e.g. 3 for a 3x3 board, 4 for a
                 4x4 board etc).
         """
-        if board_size is None:
-            board_size = self.DEFAULT_BOARD_SIZE
-        self.state = (
-            state
-            if state is not None
-            else self.get_empty_board_state(board_size)
-        )
+        if state is None:
+            state = self.get_empty_board_state(
+                self.DEFAULT_BOARD_SIZE if board_size is None else board_size
+            )
+        self.board_size = len(state)
+        self.player_mask = 0
+        self.ai_mask = 0
+        # Evaluated on first use (see game_state)
+        self._game_state: Optional[int] = utils.UNEVALUATED
+        for i, row in enumerate(state):
+            for j, col in enumerate(row):
+                if col != 0:
+                    self.play_move(i, j, col)
+
+    @classmethod
+    def from_masks(
+        cls, player_mask: int, ai_mask: int, board_size: int
+    ) -> "Board":
+        """Returns a new Board built directly from the player and AI
+        bitboards, without going through a list of lists state.
+
+        Args:
+            player_mask (int): The bitboard of cells held by the player.
+            ai_mask (int): The bitboard of cells held by the AI.
+            board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+        Returns:
+            Board: The new board.
+        """
+        board = cls.__new__(cls)
+        board.board_size = board_size
+        board.player_mask = player_mask
+        board.ai_mask = ai_mask
+        board._game_state = utils.UNEVALUATED
+        return board
+
+    @property
+    def state(self) -> List[List[int]]:
+        """Returns the state of the board as a list of lists (see __init__)
+
+        Returns:
+            List[List[int]]: The board state, where 1 is the player, -1 is the
+                AI and 0 is an empty space.
+        """
+        state = self.get_empty_board_state(self.board_size)
+        for i, row in enumerate(state):
+            for j in range(self.board_size):
+                bit = 1 << (i * self.board_size + j)
+                if self.player_mask & bit:
+                    row[j] = 1
+                elif self.ai_mask & bit:
+                    row[j] = -1
+        return state
 
     def play_move(self, row: int, col: int, player: int) -> None:
         """Updates the state of the board with the player's chosen row and
@@ -272,7 +710,12 @@ class Board:
             col (int): The column index of the column to play (0-based).
             player (int): The player value to place at the given row/column.
         """
-        self.state[row][col] = player
+        bit = 1 << (row * self.board_size + col)
+        if player == 1:
+            self.player_mask |= bit
+        else:
+            self.ai_mask |= bit
+        self._game_state = utils.UNEVALUATED
 
     def get_available_actions(self) -> List[Tuple[int, int]]:
         """Returns the available actions to take from the board (i.e. the
@@ -285,11 +728,14 @@ class Board:
             List[Tuple[int, int]]: A list of tuples, where each tuple consists
                 of a row-column pair, representing a possible action to take.
         """
+        board_size = self.board_size
+        empty = ~(self.player_mask | self.ai_mask) & utils.get_full_mask(
+            board_size
+        )
+        cell_actions = utils.get_cell_actions(board_size)
         return [
-            (i, j)
-            for i, row in enumerate(self.state)
-            for j, col in enumerate(row)
-            if col == 0
+            cell_actions[bit.bit_length() - 1]
+            for bit in utils.get_set_bits(empty)
         ]
 
     @property
@@ -303,7 +749,7 @@ class Board:
         Returns:
             int: The size of the board as an integer (i.e. rows/columns).
         """
-        return len(self.state[0])
+        return self.board_size
 
     @property
     def is_empty(self) -> bool:
@@ -312,7 +758,7 @@ class Board:
         Returns:
             bool: True if the current board is empty, False otherwise.
         """
-        return all(col == 0 for row in self.state for col in row)
+        return not self.player_mask | self.ai_mask
 
     @property
     def is_complete(self) -> bool:
@@ -323,7 +769,7 @@ class Board:
             bool: True if the board is in a finished state (i.e. the game has
                 finished), False otherwise.
         """
-        return self.game_state in [-1, 0, 1]
+        return self.game_state is not None
 
     @property
     def game_state(self) -> Optional[int]:
@@ -341,48 +787,10 @@ class Board:
                 -1: AI has won;
               None: game is still in progress
         """
-        # Check if there is a complete row (return the player value)
-        for row in self.state:
-            if abs(sum(row)) == len(row):
-                return row[0]
-
-        # Check if there is a complete column (return the player value)
-        n_cols = len(self.state[0])
-        for col_idx in range(n_cols):
-            column = [
-                self.state[row_idx][col_idx] for row_idx in range(n_cols)
-            ]
-            if abs(sum(column)) == n_cols:
-                return column[0]
-
-        # Check if there is a complete diagonal (return the player value)
-        # Detect downward diagonal from the top left
-        first_row_len = len(self.state[0])
-        downward_diagonal = [
-            self.state[idx][idx] for idx in range(first_row_len)
-        ]
-        if 0 not in downward_diagonal and all(
-            x == downward_diagonal[0] for x in downward_diagonal
-        ):
-            return downward_diagonal[0]
-
-        # Detect upward diagonal from the bottom left
-        upward_diagonal = [
-            self.state[first_row_len - 1 - idx][idx]
-            for idx in range(first_row_len)
-        ]
-        if 0 not in upward_diagonal and all(
-            x == upward_diagonal[0] for x in upward_diagonal
-        ):
-            return upward_diagonal[0]
-
-        # Check for a draw (i.e. all board spaces have been filled and we have
-        # no winner)
-        if all(col for row in self.state for col in row):
-            return 0
-
-        # Otherwise game is still in progress
-        return None
+        game_state = self._game_state = utils.get_cached_game_state(
+            self._game_state, self.player_mask, self.ai_mask, self.board_size
+        )
+        return game_state
 
     def print_board(self) -> None:
         """Prints the current state of the board.
@@ -390,27 +798,17 @@ class Board:
         A player with a value of 1 is represented as a 'O' and a player with a
         value of -1 is represented as a 'X'.
 
-        Currently, only a 3x3 board is supported.
+        Empty cells are labelled with their cell number.
         """
         board_size = self.size
-        print("\n")
-        for i, row in enumerate(self.state):
-            col_values = []
-            for j, col in enumerate(row):
-                cell_no = (i * board_size) + (j + 1)
-                pad = " "
-                if col == 1:
-                    col_values.append(f"\033[92m{pad}o\033[0;0m")
-                elif col == -1:
-                    col_values.append(f"\033[91m{pad}x\033[0;0m")
-                elif col == 0:
-                    pad = "" if cell_no >= 10 else " "
-                    col_values.append(f"\033[90m{pad}{cell_no}\033[0;0m")
-            row_str = f"\t  {' | '.join(col_values)} "
-            print(row_str)
-            if i != board_size - 1:
-                print("\t", "-" * (board_size * 5 - 1))
-        print("\n")
+        empty_cell_labels = utils.get_empty_cell_labels(board_size)
+        cells = [
+            PLAYER_SYMBOLS.get(value, empty_cell_labels[cell_no])
+            for cell_no, value in enumerate(
+                value for row in self.state for value in row
+            )
+        ]
+        print(utils.get_board_template(board_size).format(*cells), end="")
 
     def get_empty_board_state(self, board_size: int) -> List[List[int]]:
         """Returns an empty board state to use from the beginning of a tic tac
@@ -431,27 +829,107 @@ class Node:
     """Node class to represent the state of a Tic-Tac-Toe board for use in a
     tree"""
 
+    # Nodes are the most numerous objects in a search, so they store their
+    # attributes in slots rather than a per-instance __dict__
+    __slots__ = (
+        "player_mask",
+        "ai_mask",
+        "board_size",
+        "_game_state",
+        "parent",
+        "player",
+        "children",
+        "w",
+        "n",
+        "index",
+        "child_means",
+        "child_inv_ns",
+    )
+
     def __init__(
-        self, board: Board, player: int, parent: "Node" = None
+        self,
+        player_mask: int,
+        ai_mask: int,
+        board_size: int,
+        player: int,
+        parent: Optional["Node"] = None,
     ) -> None:
         """Initializes a new node with the state of a Tic-Tac-Toe board
 
+        Only the board's bitboards are stored (see Board), so no Board object
+        is created for each node of the tree.
+
         Args:
-            board (Board): The board for this node.
+            player_mask (int): The bitboard of cells held by the player.
+            ai_mask (int): The bitboard of cells held by the AI.
+            board_size (int): The size of the board (e.g. 3 for a 3x3 board).
             player (int): The value of the player which will perform an action
                 on the board associated with this node (i.e. 1 if the human
                 performs the action, -1 if the AI performs the action).
-            parent (Node, optional): The parent node of this new node. Defaults
-                to None.
+            parent (Optional[Node], optional): The parent node of this new
+                node. Defaults to None.
         """
-        self.board = board
+        self.player_mask = player_mask
+        self.ai_mask = ai_mask
+        self.board_size = board_size
+        # Evaluated on first use (see game_state)
+        self._game_state: Optional[int] = utils.UNEVALUATED
         self.parent = parent
         self.player = player
         self.children: List["Node"] = []
-        self.action = None
-        self.uct = None
         self.w = 0
         self.n = 0
+        # The position of this node in its parent's children. A node reached
+        # by several orders of moves has several parents, so parent and index
+        # refer to the parent it was last reached from (see
+        # MonteCarloTreeSearch._select)
+        self.index = 0
+        # w_i / n_i and 1 / n_i of each child, kept up to date during
+        # backpropagation so selection can score all the children in one pass
+        # without any divisions (see utils.calculate_uct_scores). Most nodes
+        # are never expanded, so the lists are only created with the first
+        # child (see add_child)
+        self.child_means: List[float]
+        self.child_inv_ns: List[float]
+
+    @classmethod
+    def from_board(cls, board: Board, player: int) -> "Node":
+        """Returns a new node for the current state of the given board.
+
+        Args:
+            board (Board): The board for the node (later moves on the board
+                don't change the node).
+            player (int): The value of the player which will perform an action
+                on the board (see __init__).
+
+        Returns:
+            Node: The new node.
+        """
+        return cls(board.player_mask, board.ai_mask, board.board_size, player)
+
+    @property
+    def board(self) -> Board:
+        """Returns a new Board with this node's state
+
+        Returns:
+            Board: The board for this node.
+        """
+        return Board.from_masks(
+            self.player_mask, self.ai_mask, self.board_size
+        )
+
+    @property
+    def game_state(self) -> Optional[int]:
+        """Returns the state of the game at this node (see Board.game_state)
+
+        Returns:
+            Optional[int]: 0 for a tie, 1 if the player has won, -1 if the AI
+                has won and None if the game is still in progress.
+        """
+        game_state = self._game_state = utils.get_cached_game_state(
+            self._game_state, self.player_mask, self.ai_mask, self.board_size
+        )
+        return game_state
 
     @property
     def visited(self) -> bool:
@@ -469,7 +947,7 @@ class Node:
         Returns:
             bool: True if this node is a terminal state, False otherwise.
         """
-        return self.board.is_complete
+        return self.game_state is not None
 
     def add_child(self, node: "Node") -> None:
         """Adds the provided node as a child to this node
@@ -477,4 +955,33 @@ class Node:
         Args:
             node (Node): The node to add as a child.
         """
+        if not self.children:
+            self.child_means = []
+            self.child_inv_ns = []
+        node.parent = self
+        node.index = len(self.children)
         self.children.append(node)
+        if node.n:
+            # The child was already visited from another parent
+            self.child_means.append(node.w / node.n)
+            self.child_inv_ns.append(1.0 / node.n)
+        else:
+            # An unvisited child has an infinite UCT score
+            self.child_means.append(math.inf)
+            self.child_inv_ns.append(0.0)
+
+    def get_action(self, child_node: "Node") -> Tuple[int, int]:
+        """Returns the action which leads from this node to the given child
+        node (a child can be reached from several parents by different
+        actions, so the action isn't stored on the child)
+
+        Args:
+            child_node (Node): A child node of this node.
+
+        Returns:
+            Tuple[int, int]: The (row, column) action.
+        """
+        bit = (child_node.player_mask | child_node.ai_mask) ^ (
+            self.player_mask | self.ai_mask
+        )
+        return utils.get_cell_actions(self.board_size)[bit.bit_length() - 1]
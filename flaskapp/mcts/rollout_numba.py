@@ -0,0 +1,212 @@
+from functools import lru_cache
+from typing import Tuple
+
+import flaskapp.mcts.utils as utils
+import numpy as np
+from numba import njit, prange
+
+
+def rollout(
+    player_mask: int, ai_mask: int, player: int, board_size: int, seed: int
+) -> int:
+    """Plays random moves from the given bitboards until the game ends, using
+    the JIT-compiled rollout kernel.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        player (int): The player to move next (1 for the player, -1 for the
+            AI).
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+        seed (int): The seed for the rollout's random moves (0 <= seed <
+            2 ** 63), so the same seed always plays the same rollout.
+
+    Returns:
+        int: The final state of the game (see Board.game_state).
+    """
+    return _rollout_kernel(
+        player_mask,
+        ai_mask,
+        player,
+        _get_win_mask_array(board_size),
+        _get_cell_win_mask_array(board_size),
+        utils.get_full_mask(board_size),
+        seed,
+    )
+
+
+def batch_rollout(
+    player_mask: int,
+    ai_mask: int,
+    player: int,
+    board_size: int,
+    n_rollouts: int,
+    seed: int,
+) -> int:
+    """Performs n_rollouts independent rollouts from the given bitboards in
+    parallel and returns the sum of their results.
+
+    Rollout i is seeded with seed + i, so the result only depends on the seed
+    and not on how the rollouts are shared between threads.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        player (int): The player to move next (1 for the player, -1 for the
+            AI).
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+        n_rollouts (int): The number of rollouts to perform.
+        seed (int): The seed of the first rollout (0 <= seed < 2 ** 63 -
+            n_rollouts).
+
+    Returns:
+        int: The sum of the final game states of the rollouts (see
+            Board.game_state).
+    """
+    if n_rollouts == 1:
+        # Starting the parallel kernel's threads costs more than one rollout
+        return rollout(player_mask, ai_mask, player, board_size, seed)
+    return _batch_rollout_kernel(
+        player_mask,
+        ai_mask,
+        player,
+        _get_win_mask_array(board_size),
+        _get_cell_win_mask_array(board_size),
+        utils.get_full_mask(board_size),
+        n_rollouts,
+        seed,
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_win_mask_array(board_size: int) -> np.ndarray:
+    """Returns the winning line masks for the given board size as an array
+    the rollout kernel can iterate over (see utils.get_win_masks)."""
+    return np.array(utils.get_win_masks(board_size), dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def _get_cell_win_mask_array(board_size: int) -> np.ndarray:
+    """Returns the winning line masks through each cell for the given board
+    size as a (cells, 4) array (see utils.get_cell_win_masks).
+
+    Cells on fewer than 4 lines are padded with -1 (every bit set), which a
+    player's mask can never contain.
+    """
+    cell_win_masks = np.full((board_size * board_size, 4), -1, dtype=np.int64)
+    for cell, win_masks in enumerate(utils.get_cell_win_masks(board_size)):
+        cell_win_masks[cell, : len(win_masks)] = win_masks
+    return cell_win_masks
+
+
+@njit(cache=True)
+def _get_winner(player_mask: int, ai_mask: int, win_masks: np.ndarray) -> int:
+    """Returns 1 if the player has a winning line, -1 if the AI has a winning
+    line, and 0 otherwise."""
+    for win_mask in win_masks:
+        if player_mask & win_mask == win_mask:
+            return 1
+        if ai_mask & win_mask == win_mask:
+            return -1
+    return 0
+
+
+@njit(cache=True)
+def _next_random(state: np.uint64) -> Tuple[np.uint64, np.uint64]:
+    """Returns the next state and the next random 64 bits of a SplitMix64
+    generator. The kernels keep the generator's state in a local rather than
+    using numba's np.random, whose state is shared by the whole process (and
+    is per thread in parallel kernels), so a rollout only depends on its
+    seed."""
+    state = state + np.uint64(0x9E3779B97F4A7C15)
+    bits = state
+    bits = (bits ^ (bits >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    bits = (bits ^ (bits >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return state, bits ^ (bits >> np.uint64(31))
+
+
+@njit(cache=True)
+def _rollout_kernel(
+    player_mask: int,
+    ai_mask: int,
+    player: int,
+    win_masks: np.ndarray,
+    cell_win_masks: np.ndarray,
+    full_mask: int,
+    seed: int,
+) -> int:
+    """JIT-compiled equivalent of the pure Python
+    MonteCarloTreeSearch._play_out loop, drawing its moves from a generator
+    seeded with the given seed (see _next_random)."""
+    winner = _get_winner(player_mask, ai_mask, win_masks)
+    if winner != 0:
+        return winner
+
+    empty = ~(player_mask | ai_mask) & full_mask
+    n_empty = 0
+    remaining = empty
+    while remaining:
+        remaining &= remaining - 1
+        n_empty += 1
+
+    state = np.uint64(seed)
+    while n_empty:
+        # Select the k-th empty cell by clearing the k lowest empty cells
+        state, bits = _next_random(state)
+        remaining = empty
+        for _ in range(np.int64(bits % np.uint64(n_empty))):
+            remaining &= remaining - 1
+        bit = remaining & -remaining
+        empty ^= bit
+        n_empty -= 1
+
+        # Only the lines through the cell just played can have been
+        # completed, and only by the player who played it
+        if player == 1:
+            player_mask |= bit
+            mover_mask = player_mask
+        else:
+            ai_mask |= bit
+            mover_mask = ai_mask
+        cell = 0
+        while bit > 1:
+            bit >>= 1
+            cell += 1
+        for win_mask in cell_win_masks[cell]:
+            if mover_mask & win_mask == win_mask:
+                return player
+        player = -player
+    return 0
+
+
+@njit(cache=True, parallel=True)
+def _batch_rollout_kernel(
+    player_mask: int,
+    ai_mask: int,
+    player: int,
+    win_masks: np.ndarray,
+    cell_win_masks: np.ndarray,
+    full_mask: int,
+    n_rollouts: int,
+    seed: int,
+) -> int:
+    """Runs _rollout_kernel n_rollouts times across all cores and sums the
+    results. Rollout i is seeded with seed + i (see batch_rollout)."""
+    total = 0
+    for i in prange(n_rollouts):
+        total += _rollout_kernel(
+            player_mask,
+            ai_mask,
+            player,
+            win_masks,
+            cell_win_masks,
+            full_mask,
+            seed + i,
+        )
+    return total
+
+
+# Compile the rollout kernel (or load it from numba's cache) on import, so
+# the first search doesn't pay for it. The kernel's types are the same for
+# every board size
+rollout(0, 0, 1, 3, 0)
@@ -17,10 +17,13 @@
 #   [7]: https://en.wikipedia.org/wiki/Monte_Carlo_tree_search#/media/File:MCTS-steps.svg
 #        (MCTS Wikipedia)
 
+import argparse
 import random
 from multiprocessing.sharedctypes import Value
 from typing import Optional, Tuple
 
+import flaskapp.mcts.utils as utils
+from flaskapp.mcts.alphabeta import AlphaBetaSearch
 from flaskapp.mcts.mcts import Board, MonteCarloTreeSearch
 
 # Initialize a random seed for deterministic games
@@ -31,7 +34,11 @@ SEED = 42
 class TicTacToe:
     """TicTacToe class to initialize a new Tic-Tac-Toe game"""
 
-    def __init__(self, board: Board = None) -> None:
+    def __init__(
+        self,
+        board: Board = None,
+        mcts: Optional[MonteCarloTreeSearch] = None,
+    ) -> None:
         """Initializes a new Tic-Tac-Toe game.
 
         By default, an empty board state is used, however a partial board can
@@ -41,30 +48,63 @@ class TicTacToe:
         Args:
             board (Board, optional): An optional Board object to use at the
                 start of the game.
+            mcts (MonteCarloTreeSearch, optional): An optional search to
+                continue from (e.g. the search from the previous move of the
+                game, so its search tree can be reused). Defaults to a new
+                search.
         """
         self.board = Board() if board is None else board
+        self.mcts = MonteCarloTreeSearch() if mcts is None else mcts
 
-    def play(self, player_position: int, iterations: int) -> None:
-        """Begins Tic-Tac-Toe by alternating between human and AI moves (in the Flask app)"""
-        # Initialize MCTS
-        self.mcts = MonteCarloTreeSearch()
+    def play(
+        self, player_position: int, iterations: int, use_mcts: bool = False
+    ) -> Optional[Tuple[int, int]]:
+        """Plays one round of Tic-Tac-Toe: the human's move followed by the AI's
+        reply (in the Flask app)
 
+        Args:
+            player_position (int): The board position the human played (see
+                get_user_position).
+            iterations (int): The number of MCTS iterations to run.
+            use_mcts (bool, optional): Whether the AI uses MCTS even on a
+                board small enough to solve exactly (see find_ai_move).
+                Defaults to False.
+
+        Returns:
+            Optional[Tuple[int, int]]: The (row, column) action the AI played,
+                or None if the AI didn't move (the game is over or the human's
+                position wasn't legal).
+        """
         # Player's turn
         if self.board.is_complete:
-            return
+            return None
+        (player_row, player_col) = self.get_user_position(player_position)
+        if player_row is None or player_col is None:
+            return None
+        self.board.play_move(player_row, player_col, 1)
+        if self.board.is_complete:
+            self.mcts.clear_search_tree()
+            return None
 
         # AI's turn
-        (row, col) = self.mcts.find_best_move(
-            board=self.board, iterations=iterations
+        (row, col) = self.find_ai_move(
+            iterations=iterations, use_mcts=use_mcts
         )
         self.board.play_move(row, col, -1)
         if self.board.is_complete:
-            return
+            # There are no more moves to search, so the tree isn't kept
+            self.mcts.clear_search_tree()
+        return (row, col)
+
+    def play_shell(self, use_mcts: bool = False) -> None:
+        """Begins Tic-Tac-Toe by alternating between human and AI moves (in the shell)
 
-    def play_shell(self) -> None:
-        """Begins Tic-Tac-Toe by alternating between human and AI moves (in the shell)"""
-        # Initialize MCTS
-        self.mcts = MonteCarloTreeSearch()
+        Args:
+            use_mcts (bool, optional): Whether the AI uses MCTS even on a
+                board small enough to solve exactly (see find_ai_move), e.g.
+                to compare MCTS with alpha-beta search on 3x3. Defaults to
+                False.
+        """
         self.board.print_board()
 
         # Game loop
@@ -79,8 +119,8 @@ class TicTacToe:
                 break
 
             # AI's turn
-            (row, col) = self.mcts.find_best_move(
-                board=self.board, iterations=1_000
+            (row, col) = self.find_ai_move(
+                iterations=1_000, show_progress=True, use_mcts=use_mcts
             )
             print("\nTTTAI's move:")
             self.board.play_move(row, col, -1)
@@ -89,6 +129,37 @@ class TicTacToe:
                 print(self.game_state_msg)
                 break
 
+    def find_ai_move(
+        self,
+        iterations: int,
+        show_progress: bool = False,
+        use_mcts: bool = False,
+    ) -> Tuple[int, int]:
+        """Finds the AI's next move from the current board.
+
+        Boards small enough to solve exactly (see AlphaBetaSearch) are solved
+        with alpha-beta search, which is both faster and optimal, unless
+        use_mcts is set. Otherwise MCTS is used.
+
+        Args:
+            iterations (int): The number of MCTS iterations to run.
+            show_progress (bool, optional): Whether to show a progress bar of
+                the MCTS iterations. Defaults to False.
+            use_mcts (bool, optional): Whether to use MCTS even on a board
+                small enough to solve exactly (e.g. to compare the two).
+                Defaults to False.
+
+        Returns:
+            Tuple[int, int]: The (row, column) action to take.
+        """
+        if not use_mcts and self.board.size <= AlphaBetaSearch.MAX_BOARD_SIZE:
+            return AlphaBetaSearch().find_best_move(board=self.board)
+        return self.mcts.find_best_move(
+            board=self.board,
+            iterations=iterations,
+            show_progress=show_progress,
+        )
+
     @property
     def game_state_msg(self) -> Optional[str]:
         """Prints the result of the game"""
@@ -141,17 +212,23 @@ class TicTacToe:
                 except ValueError:
                     print("Not a legal move. Please try again.")
 
-        row = (player_position - 1) // board_size
-        col = (player_position - 1) % board_size
-        if (
-            1 <= player_position <= total_positions
-            and self.board.state[row][col] == 0
+        cell = player_position - 1
+        if 0 <= cell < total_positions and not (
+            (self.board.player_mask | self.board.ai_mask) >> cell & 1
         ):
-            return (row, col)
+            return utils.get_cell_actions(board_size)[cell]
         return (None, None)
 
 
 # Entry point
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe vs the AI")
+    parser.add_argument(
+        "--mcts",
+        action="store_true",
+        help="use MCTS even on 3x3 boards (which are otherwise solved with "
+        "alpha-beta search)",
+    )
+    args = parser.parse_args()
     # TicTacToe(board=Board(state=[[1, -1, -1], [0, 1, 0], [0, 0, 0]])).play()
-    TicTacToe().play_shell()
+    TicTacToe().play_shell(use_mcts=args.mcts)
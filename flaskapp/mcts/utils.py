@@ -1,11 +1,16 @@
 import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 
-def calculate_uct(
-    child_node: "Node", parent_node: "Node", c: int = 2
-) -> float:
-    """Calculates the UCT (upper confidence tree) score for the given
-    child_node using the following equation:
+def calculate_uct_scores(
+    child_means: List[float],
+    child_inv_ns: List[float],
+    log_parent_n: float,
+    c: int = 2,
+) -> List[float]:
+    """Calculates the UCT (upper confidence tree) score of each child of a
+    node using the following equation:
 
         UCT_i = (w_i / n_i) + c * sqrt(ln(n_p) / n_i)
 
@@ -16,18 +21,437 @@ def calculate_uct(
             tradeoff;
         n_p: is the visit count for the parent of the i'th child;
 
+    The children's w_i / n_i and 1 / n_i values are stored by the parent node
+    (see Node.child_means and Node.child_inv_ns), and ln(n_p) is the same for
+    every child so it is computed once by the caller.
+
     Args:
-        child_node (Node): The child node to calculate the UCT value for.
-        parent_node (Node): The parent node of the child node.
+        child_means (List[float]): w_i / n_i for each child (infinity for an
+            unvisited child).
+        child_inv_ns (List[float]): 1 / n_i for each child (0 for an
+            unvisited child).
+        log_parent_n (float): The natural log of the parent's visit count.
         c (int): Hyperparameter to control the exploration/exploitation
             tradeoff in the equation.
 
     Returns:
-        float: infinity if the child has never been visited, otherwise the UCT
-            score
+        List[float]: The UCT score of each child (infinity for an unvisited
+            child).
+    """
+    return [
+        mean + c * math.sqrt(log_parent_n * inv_n)
+        for mean, inv_n in zip(child_means, child_inv_ns)
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_win_masks(board_size: int) -> Tuple[int, ...]:
+    """Returns the bitmasks of every winning line (rows, columns and both
+    diagonals) for a board of the given size.
+
+    Cell (row, col) of a board is stored at bit (row * board_size + col), so
+    for a 3x3 board the 8 winning masks are:
+
+        0b000000111, 0b000111000, 0b111000000,  (rows)
+        0b001001001, 0b010010010, 0b100100100,  (columns)
+        0b100010001, 0b001010100                (diagonals)
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[int, ...]: The winning line masks.
+    """
+    row_mask = (1 << board_size) - 1
+    col_mask = sum(1 << (i * board_size) for i in range(board_size))
+    rows = [row_mask << (i * board_size) for i in range(board_size)]
+    cols = [col_mask << i for i in range(board_size)]
+    downward_diagonal = sum(
+        1 << (i * board_size + i) for i in range(board_size)
+    )
+    upward_diagonal = sum(
+        1 << ((board_size - 1 - i) * board_size + i) for i in range(board_size)
+    )
+    return tuple(rows + cols + [downward_diagonal, upward_diagonal])
+
+
+@lru_cache(maxsize=None)
+def get_cell_win_masks(board_size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Returns the winning line masks passing through each cell of a board of
+    the given size, indexed by cell (i.e. bit position).
+
+    A move can only complete a line through the cell it was played in, so
+    only these lines need checking after each move (2 to 4 lines, instead of
+    every line on the board).
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[Tuple[int, ...], ...]: The winning line masks of each cell.
+    """
+    win_masks = get_win_masks(board_size)
+    return tuple(
+        tuple(win_mask for win_mask in win_masks if win_mask >> cell & 1)
+        for cell in range(board_size * board_size)
+    )
+
+
+def get_winning_bit(mask: int, empty: int, board_size: int) -> int:
+    """Returns an empty cell (as a single-bit mask) which would complete a
+    winning line for the side holding the given mask, or 0 if there is none.
+
+    Args:
+        mask (int): The bitboard of cells held by one side.
+        empty (int): The bitboard of empty cells.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        int: The single-bit mask of a winning cell, or 0.
+    """
+    for win_mask in get_win_masks(board_size):
+        # The line is one move from complete if exactly one of its cells is
+        # missing and that cell is empty
+        missing = win_mask & ~mask
+        if missing & empty and not missing & (missing - 1):
+            return missing
+    return 0
+
+
+@lru_cache(maxsize=None)
+def get_full_mask(board_size: int) -> int:
+    """Returns the bitmask with every cell of a board of the given size set.
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        int: The mask of all board cells.
+    """
+    return (1 << (board_size * board_size)) - 1
+
+
+def get_set_bits(mask: int) -> List[int]:
+    """Returns each set bit of the given mask as its own single-bit mask,
+    from the lowest bit to the highest.
+
+    Args:
+        mask (int): The mask to decompose.
+
+    Returns:
+        List[int]: The single-bit masks (e.g. 0b1010 -> [0b10, 0b1000]).
+    """
+    bits = []
+    while mask:
+        # Isolate the lowest set bit, then clear it
+        bit = mask & -mask
+        bits.append(bit)
+        mask ^= bit
+    return bits
+
+
+@lru_cache(maxsize=None)
+def get_cell_actions(board_size: int) -> Tuple[Tuple[int, int], ...]:
+    """Returns the (row, column) action of every cell of a board of the given
+    size, indexed by cell (i.e. bit position).
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[Tuple[int, int], ...]: The (row, column) action of each cell.
+    """
+    return tuple(
+        divmod(cell, board_size) for cell in range(board_size * board_size)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_move_order(board_size: int) -> Tuple[int, ...]:
+    """Returns every cell of a board of the given size as a single-bit mask,
+    ordered by how many winning lines pass through the cell (most first).
+
+    Searching the strongest moves first lets alpha-beta search prune more of
+    the tree. For a 3x3 board this is the center, then the corners, then the
+    edges.
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[int, ...]: The single-bit mask of each cell.
+    """
+    win_masks = get_win_masks(board_size)
+    cells = sorted(
+        range(board_size * board_size),
+        key=lambda cell: -sum(win_mask >> cell & 1 for win_mask in win_masks),
+    )
+    return tuple(1 << cell for cell in cells)
+
+
+@lru_cache(maxsize=None)
+def get_symmetries(board_size: int) -> Tuple[Tuple[int, ...], ...]:
+    """Returns the 8 symmetries of a square board (4 rotations, each with and
+    without a reflection) as cell permutations, where symmetry[i] is the cell
+    index that cell i is moved to.
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[Tuple[int, ...], ...]: The 8 cell permutations, starting with
+            the identity.
+    """
+    last = board_size - 1
+    symmetries = []
+    for transpose in (False, True):
+        for flip_rows in (False, True):
+            for flip_cols in (False, True):
+                symmetry = []
+                for cell in range(board_size * board_size):
+                    row, col = divmod(cell, board_size)
+                    if transpose:
+                        row, col = col, row
+                    if flip_rows:
+                        row = last - row
+                    if flip_cols:
+                        col = last - col
+                    symmetry.append(row * board_size + col)
+                symmetries.append(tuple(symmetry))
+    return tuple(symmetries)
+
+
+def transform_mask(mask: int, symmetry: Tuple[int, ...]) -> int:
+    """Returns the given mask with its cells moved by the given symmetry (see
+    get_symmetries).
+
+    Args:
+        mask (int): The mask to transform.
+        symmetry (Tuple[int, ...]): The cell permutation to apply.
+
+    Returns:
+        int: The transformed mask.
+    """
+    transformed_mask = 0
+    for bit in get_set_bits(mask):
+        transformed_mask |= 1 << symmetry[bit.bit_length() - 1]
+    return transformed_mask
+
+
+def get_canonical_masks(
+    player_mask: int, ai_mask: int, board_size: int
+) -> Tuple[int, int, Tuple[int, ...]]:
+    """Returns the canonical form of a position, i.e. the smallest
+    (player_mask, ai_mask) pair over all 8 symmetries of the board, so that
+    positions which are rotations/reflections of each other share one form.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[int, int, Tuple[int, ...]]: The canonical player mask, the
+            canonical AI mask and the symmetry mapping the position onto its
+            canonical form.
+    """
+    return min(
+        (
+            transform_mask(player_mask, symmetry),
+            transform_mask(ai_mask, symmetry),
+            symmetry,
+        )
+        for symmetry in get_symmetries(board_size)
+    )
+
+
+# int.bit_count counts the bits without building a string, but is only
+# available from Python 3.10
+_HAS_BIT_COUNT = hasattr(int, "bit_count")
+
+
+def count_set_bits(mask: int) -> int:
+    """Returns the number of set bits in the given mask.
+
+    Args:
+        mask (int): The mask to count the set bits of.
+
+    Returns:
+        int: The number of set bits (e.g. 0b1011 -> 3).
+    """
+    if _HAS_BIT_COUNT:
+        return mask.bit_count()
+    return bin(mask).count("1")
+
+
+@lru_cache(maxsize=None)
+def get_board_template(board_size: int) -> str:
+    """Returns the format string used to print a board of the given size,
+    with one replacement field per cell (see Board.print_board).
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        str: The board template.
+    """
+    row = "\t  " + " | ".join(["{}"] * board_size) + " "
+    separator = "\t " + "-" * (board_size * 5 - 1)
+    return "\n\n" + f"\n{separator}\n".join([row] * board_size) + "\n\n\n"
+
+
+@lru_cache(maxsize=None)
+def get_empty_cell_labels(board_size: int) -> Tuple[str, ...]:
+    """Returns the label printed for each empty cell of a board of the given
+    size, i.e. its cell number (as entered in the shell) in grey.
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Tuple[str, ...]: The label of each cell.
     """
-    if child_node.n == 0:
-        return float("inf")
-    return (child_node.w / child_node.n) + c * (
-        (math.log(parent_node.n) / child_node.n) ** 0.5
+    return tuple(
+        f"\033[90m{cell_no:>2}\033[0;0m"
+        for cell_no in range(1, board_size * board_size + 1)
     )
+
+
+def get_game_state(
+    player_mask: int, ai_mask: int, board_size: int
+) -> Optional[int]:
+    """Returns the state of the game for the given player and AI bitboards.
+
+    For board sizes in the precomputed outcome table (see
+    _build_outcome_table) this is a single dict lookup, otherwise the
+    winning lines are checked directly.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Optional[int]: An optional integer:
+             0: game finished as a tie;
+             1: player has won;
+            -1: AI has won;
+          None: game is still in progress
+    """
+    outcome_table = _OUTCOME_TABLES.get(board_size)
+    if outcome_table is not None:
+        try:
+            return outcome_table[(player_mask, ai_mask)]
+        except KeyError:
+            # Unreachable positions (e.g. a custom starting state) are not
+            # in the table
+            pass
+    return _evaluate_game_state(player_mask, ai_mask, board_size)
+
+
+# The game state of a board or node is evaluated on first use and cached
+# until a move is played (see get_cached_game_state). UNEVALUATED marks a
+# game state which hasn't been evaluated yet, as None means "game in
+# progress".
+UNEVALUATED: int = 2
+
+
+def get_cached_game_state(
+    game_state: Optional[int], player_mask: int, ai_mask: int, board_size: int
+) -> Optional[int]:
+    """Returns the given cached game state, evaluating it from the bitboards
+    if it hasn't been evaluated yet (see Board.game_state and
+    Node.game_state).
+
+    Args:
+        game_state (Optional[int]): The cached game state, or UNEVALUATED.
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Optional[int]: The game state (see get_game_state).
+    """
+    if game_state == UNEVALUATED:
+        return get_game_state(player_mask, ai_mask, board_size)
+    return game_state
+
+
+def _evaluate_game_state(
+    player_mask: int, ai_mask: int, board_size: int
+) -> Optional[int]:
+    """Evaluates the state of the game for the given player and AI bitboards
+    by checking every winning line.
+
+    Args:
+        player_mask (int): The bitboard of cells held by the player.
+        ai_mask (int): The bitboard of cells held by the AI.
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Optional[int]: An optional integer:
+             0: game finished as a tie;
+             1: player has won;
+            -1: AI has won;
+          None: game is still in progress
+    """
+    # Check if either side has a complete row/column/diagonal
+    for win_mask in get_win_masks(board_size):
+        if player_mask & win_mask == win_mask:
+            return 1
+        if ai_mask & win_mask == win_mask:
+            return -1
+
+    # Check for a draw (i.e. all board spaces have been filled and we have
+    # no winner)
+    if player_mask | ai_mask == get_full_mask(board_size):
+        return 0
+
+    # Otherwise game is still in progress
+    return None
+
+
+def _build_outcome_table(
+    board_size: int,
+) -> Dict[Tuple[int, int], Optional[int]]:
+    """Builds a table mapping every position reachable from the empty board
+    (with either side moving first) to its game state.
+
+    There are only a few thousand reachable positions on a 3x3 board, so the
+    whole table is built once at import time. Larger boards have far too many
+    positions to enumerate.
+
+    Args:
+        board_size (int): The size of the board (e.g. 3 for a 3x3 board).
+
+    Returns:
+        Dict[Tuple[int, int], Optional[int]]: The game state for each
+            (player_mask, ai_mask) pair.
+    """
+    full_mask = get_full_mask(board_size)
+    outcome_table: Dict[Tuple[int, int], Optional[int]] = {}
+    visited = set()
+    stack = [(0, 0, 1), (0, 0, -1)]
+    while stack:
+        position = stack.pop()
+        if position in visited:
+            continue
+        visited.add(position)
+
+        player_mask, ai_mask, player = position
+        game_state = _evaluate_game_state(player_mask, ai_mask, board_size)
+        outcome_table[(player_mask, ai_mask)] = game_state
+        if game_state is not None:
+            continue
+
+        for bit in get_set_bits(~(player_mask | ai_mask) & full_mask):
+            if player == 1:
+                stack.append((player_mask | bit, ai_mask, -1))
+            else:
+                stack.append((player_mask, ai_mask | bit, 1))
+    return outcome_table
+
+
+_OUTCOME_TABLES: Dict[int, Dict[Tuple[int, int], Optional[int]]] = {
+    3: _build_outcome_table(3)
+}
@@ -16,18 +16,12 @@ $(document).on('submit', '#game-board-form', function(e) {
         return;
     }
     
-    // Let the AI think, then update the UI with the AI's move
-    if (clickedCell.attr('name') !== 'reset') {
-        clickedCell.addClass('playerCell');
-        clickedCell.text('O');
-        $("#game-state-info h4").text("AI is thinking...");
-        $('.cell').attr("disabled", true);
-    }
-    
-    // Get current state of the board
+    // Get the current state of the board, before the move is played. The
+    // client's board is the state of the game, so the server can play the
+    // move even if it no longer has this game
     let boardState = []
     let cellCounter = 1;
-    for (let i = 0; i < boardSize; i++) { 
+    for (let i = 0; i < boardSize; i++) {
         let rowCells = [];
         for (let j = 0; j < boardSize; j++) {
             let cellOnBoard = $(`#game-board-form button[id='${cellCounter}']`);
@@ -41,56 +35,59 @@ $(document).on('submit', '#game-board-form', function(e) {
             cellCounter += 1;
         }
         boardState.push(rowCells);
-      
     }
 
+    // Let the AI think, then update the UI with the AI's move
+    const isReset = clickedCell.attr('name') === 'reset';
+    if (!isReset) {
+        clickedCell.addClass('playerCell');
+        clickedCell.text('O');
+        $("#game-state-info h4").text("AI is thinking...");
+        $('.cell').attr("disabled", true);
+    }
+
+    // The game id lets the server reuse the search tree it built for this
+    // page's previous move, and only the AI's reply comes back
+    const gameForm = $('#game-board-form');
+    const gameId = gameForm.attr('data-game-id');
+    const data = isReset ? {
+        reset: true,
+        game_id: gameId,
+        board_size: boardSize
+    } : {
+        cell: cellId,
+        board_state: JSON.stringify(boardState),
+        game_id: gameId,
+        board_size: boardSize,
+        mcts_iterations: mctsIterations,
+        use_mcts: $('#use_mcts').is(':checked')
+    };
+
     $.ajax({
         type: 'POST',
         url: '/play',
-        data: {
-            cell: cellId,
-            board_state: JSON.stringify(boardState),
-            board_size: boardSize,
-            mcts_iterations: mctsIterations
-        },
+        data: data,
         success: function(response) {
-            const { board, game_state_message } = response;
-            $('.cell').attr("disabled", false);
-            let cellPos = 1;
+            const { game_id, ai_cell, game_state_message } = response;
+            gameForm.attr('data-game-id', game_id);
+            if (isReset) {
+                $('.cell').text('');
+                $('.cell').removeClass('playerCell aiCell');
+                $('.cell').addClass('blankCell');
+            }
+            if (ai_cell !== null) {
+                let cellOnBoard = $(`#game-board-form button[id='${ai_cell}']`);
+                cellOnBoard.text('X');
+                cellOnBoard.removeClass('blankCell');
+                cellOnBoard.addClass('aiCell');
+            }
             if (game_state_message) {
                 $("#game-state-info h4").text(game_state_message);
+                $('.cell').prop("disabled", true);
             } else {
                 $("#game-state-info h4").text("Player's Turn");
+                $('.cell').prop("disabled", false);
             }
-            for (let i = 0; i < board.length; i++) { 
-                for (let j = 0; j < board[0].length; j++) {
-                    const player = board[i][j];
-                    let cellOnBoard = $(`#game-board-form button[id='${cellPos}']`);
-                    switch (player) {
-                        case 1:
-                            cellOnBoard.text('O');
-                            cellOnBoard.removeClass('blankCell');
-                            cellOnBoard.addClass('playerCell');
-                            break;
-                        case -1:
-                            cellOnBoard.text('X');
-                            cellOnBoard.removeClass('blankCell');
-                            cellOnBoard.addClass('aiCell');
-                            break;
-                        default:   
-                            cellOnBoard.text('');
-                            cellOnBoard.removeClass('playerCell');
-                            cellOnBoard.removeClass('aiCell');
-                            cellOnBoard.addClass('blankCell');
-                            cellOnBoard.prop("disabled", false);
-                            break;
-                    }
-                    if (game_state_message !== null) {
-                        cellOnBoard.prop("disabled", true);
-                    }
-                    cellPos += 1;
-                }
-            }  
         },
         error: function() {
             alert('error');
@@ -98,14 +95,28 @@ $(document).on('submit', '#game-board-form', function(e) {
     })
 });
 
+// 3x3 boards are solved exactly rather than searched with MCTS (unless
+// "Use MCTS on 3x3" is ticked), so the MCTS controls don't apply to them
+function updateControls() {
+    const isSmallBoard = $('#board_size').val() === '3';
+    const useMcts = !isSmallBoard || $('#use_mcts').is(':checked');
+    $('#use_mcts').prop('disabled', !isSmallBoard);
+    $('#mcts_iterations, #uct_c').prop('disabled', !useMcts);
+}
+
+$(document).ready(updateControls);
+$('#use_mcts').on('change', updateControls);
+
 // Game controls radio button
 $("#board_size").on("change", function(e) {
+    updateControls();
     const boardSize = $(this).val();
     $.ajax({
         type: 'POST',
         url: '/board',
         data: {
-            board_size: boardSize
+            board_size: boardSize,
+            game_id: $('#game-board-form').attr('data-game-id')
         },
         success: function(response) {
             $("#game-board-form").replaceWith(response);
@@ -0,0 +1,73 @@
+import unittest
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from flaskapp.mcts.alphabeta import AlphaBetaSearch, solve
+from flaskapp.mcts.mcts import Board
+
+
+@lru_cache(maxsize=None)
+def minimax(player_mask: int, ai_mask: int, player: int) -> int:
+    """Returns the value of a 3x3 position for the player to move (1 for a
+    win, 0 for a tie and -1 for a loss) by searching every move."""
+    board = Board.from_masks(player_mask, ai_mask, 3)
+    if board.is_complete:
+        return board.game_state * player  # type: ignore[operator]
+    values = []
+    for row, col in board.get_available_actions():
+        child = Board.from_masks(player_mask, ai_mask, 3)
+        child.play_move(row, col, player)
+        values.append(-minimax(child.player_mask, child.ai_mask, -player))
+    return max(values)
+
+
+def get_reachable_positions() -> Dict[Tuple[int, int], int]:
+    """Returns every non-terminal position reachable from the empty 3x3
+    board (the player moving first) and the player to move in it."""
+    positions = {}
+    stack = [(0, 0, 1)]
+    while stack:
+        player_mask, ai_mask, player = stack.pop()
+        board = Board.from_masks(player_mask, ai_mask, 3)
+        if (player_mask, ai_mask) in positions or board.is_complete:
+            continue
+        positions[(player_mask, ai_mask)] = player
+        for row, col in board.get_available_actions():
+            child = Board.from_masks(player_mask, ai_mask, 3)
+            child.play_move(row, col, player)
+            stack.append((child.player_mask, child.ai_mask, -player))
+    return positions
+
+
+class AlphaBetaSearchTest(unittest.TestCase):
+    def test_matches_minimax(self) -> None:
+        positions = get_reachable_positions()
+        self.assertEqual(len(positions), 4520)
+        for (player_mask, ai_mask), player in positions.items():
+            (row, col), value = solve(player_mask, ai_mask, player, 3)
+            expected = minimax(player_mask, ai_mask, player)
+            # The value is scaled by how quickly the game ends, but has the
+            # sign of the game's result
+            self.assertEqual((value > 0) - (value < 0), expected)
+
+            # The move is legal and keeps the position's value
+            board = Board.from_masks(player_mask, ai_mask, 3)
+            self.assertIn((row, col), board.get_available_actions())
+            board.play_move(row, col, player)
+            self.assertEqual(
+                -minimax(board.player_mask, board.ai_mask, -player), expected
+            )
+
+    def test_finished_game(self) -> None:
+        for state in (
+            # Full board (a tie)
+            [[1, -1, 1], [1, -1, -1], [-1, 1, 1]],
+            # Won board with empty cells
+            [[1, 1, 1], [-1, -1, 0], [0, 0, 0]],
+        ):
+            with self.assertRaises(ValueError):
+                AlphaBetaSearch().find_best_move(Board(state=state))
+
+
+if __name__ == "__main__":
+    unittest.main()
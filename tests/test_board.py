@@ -0,0 +1,67 @@
+import itertools
+import random
+import unittest
+from typing import List, Optional
+
+from flaskapp.mcts.mcts import Board
+
+
+def get_naive_game_state(state: List[List[int]]) -> Optional[int]:
+    """Returns the state of the game (see Board.game_state) by checking each
+    row, column and diagonal of the list of lists state, or 2 if both sides
+    have a complete line (which can't happen in a game)."""
+    size = len(state)
+    lines = [list(row) for row in state]
+    lines += [[state[i][j] for i in range(size)] for j in range(size)]
+    lines.append([state[i][i] for i in range(size)])
+    lines.append([state[i][size - 1 - i] for i in range(size)])
+    winners = {line[0] for line in lines if line[0] and len(set(line)) == 1}
+    if len(winners) == 2:
+        return 2
+    if winners:
+        return winners.pop()
+    if all(value != 0 for row in state for value in row):
+        return 0
+    return None
+
+
+class BoardTest(unittest.TestCase):
+    def test_game_state_3x3(self) -> None:
+        # Every assignment of the cells, including positions which can't be
+        # reached in a game (e.g. more AI cells than player cells), which the
+        # outcome table doesn't hold
+        for values in itertools.product((0, 1, -1), repeat=9):
+            state = [list(values[i : i + 3]) for i in range(0, 9, 3)]
+            board = Board(state=state)
+            self.assertEqual(board.state, state)
+            expected = get_naive_game_state(state)
+            if expected != 2:
+                self.assertEqual(board.game_state, expected, state)
+
+    def test_game_state_larger_boards(self) -> None:
+        rng = random.Random(0)
+        for board_size in (4, 5):
+            for _ in range(2_000):
+                state = [
+                    [rng.choice((0, 0, 1, -1)) for _ in range(board_size)]
+                    for _ in range(board_size)
+                ]
+                board = Board(state=state)
+                self.assertEqual(board.state, state)
+                expected = get_naive_game_state(state)
+                if expected != 2:
+                    self.assertEqual(board.game_state, expected, state)
+
+    def test_play_move_updates_game_state(self) -> None:
+        board = Board(state=[[1, 1, 0], [-1, -1, 0], [0, 0, 0]])
+        self.assertIsNone(board.game_state)
+        self.assertEqual(len(board.get_available_actions()), 5)
+        board.play_move(0, 2, 1)
+        self.assertEqual(board.state, [[1, 1, 1], [-1, -1, 0], [0, 0, 0]])
+        self.assertEqual(board.game_state, 1)
+        self.assertTrue(board.is_complete)
+        self.assertNotIn((0, 2), board.get_available_actions())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from typing import List
+
+import flaskapp.mcts.utils as utils
+from flaskapp.mcts.mcts import Board, MonteCarloTreeSearch
+from tests.test_alphabeta import minimax
+
+
+class MonteCarloTreeSearchTest(unittest.TestCase):
+    def test_reused_root_with_visited_children(self) -> None:
+        # The second position is in the first search's tree and its children
+        # were all visited through other parents, but the node itself never
+        # was, so the new root starts with n == 0
+        mcts = MonteCarloTreeSearch(seed=1)
+        mcts.find_best_move(
+            Board(state=[[0, 1, 0], [0, 0, 0], [0, 0, 0]]), iterations=3000
+        )
+        board = Board(state=[[0, 1, 0], [-1, 0, 1], [1, 0, -1]])
+        row, col = mcts.find_best_move(board, iterations=5)
+        self.assertIn((row, col), board.get_available_actions())
+
+    def test_seeded_search_is_repeatable(self) -> None:
+        board = Board(state=[[1, 0, 0, 0], [0, -1, 0, 0], [0] * 4, [0] * 4])
+
+        def root_visits(
+            rollouts_per_leaf: int, seed_another: bool
+        ) -> List[int]:
+            MonteCarloTreeSearch._best_move_cache.clear()
+            mcts = MonteCarloTreeSearch(seed=1)
+            if seed_another:
+                # Other searches (e.g. of concurrent requests) don't change
+                # this search's random numbers
+                MonteCarloTreeSearch(seed=2)
+            mcts.find_best_move(board, 500, rollouts_per_leaf)
+            root_node = mcts.transpositions[(board.player_mask, board.ai_mask)]
+            return [child_node.n for child_node in root_node.children]
+
+        for rollouts_per_leaf in (1, 8):
+            self.assertEqual(
+                root_visits(rollouts_per_leaf, seed_another=False),
+                root_visits(rollouts_per_leaf, seed_another=True),
+            )
+
+    def test_cached_move_under_symmetries(self) -> None:
+        MonteCarloTreeSearch._best_move_cache.clear()
+        for state in (
+            [[1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[0, 1, 0], [0, -1, 0], [1, 0, 0]],
+            [[1, 0, -1], [0, 1, 0], [0, 0, 0]],
+            [[0, 1, 0, 0], [0, 0, 0, 0], [0, 0, -1, 0], [0, 0, 0, 1]],
+        ):
+            board = Board(state=state)
+            board_size = board.board_size
+            row, col = MonteCarloTreeSearch(seed=1).find_best_move(board, 200)
+            cell = row * board_size + col
+            for symmetry in utils.get_symmetries(board_size):
+                transformed_board = Board.from_masks(
+                    utils.transform_mask(board.player_mask, symmetry),
+                    utils.transform_mask(board.ai_mask, symmetry),
+                    board_size,
+                )
+                mcts = MonteCarloTreeSearch(seed=1)
+                action = mcts.find_best_move(transformed_board, 200)
+                # The move came from the cache (no tree was searched) and is
+                # the cached move moved by the same symmetry
+                self.assertEqual(mcts.tree_size, 0)
+                self.assertEqual(
+                    action, divmod(symmetry[cell], board_size), state
+                )
+                self.assertIn(
+                    action, transformed_board.get_available_actions()
+                )
+                if board_size == 3:
+                    # The move is as good as the cached move
+                    transformed_board.play_move(*action, -1)
+                    self.assertEqual(
+                        minimax(
+                            transformed_board.player_mask,
+                            transformed_board.ai_mask,
+                            1,
+                        ),
+                        minimax(
+                            board.player_mask, board.ai_mask | 1 << cell, 1
+                        ),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import unittest
+from typing import Any, Dict, List
+
+from flaskapp import create_app
+from flaskapp.home import routes
+
+
+class RoutesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        routes.games.clear()
+        self.client = create_app().test_client()
+
+    def play(
+        self,
+        cell: int,
+        board_state: List[List[int]],
+        game_id: str = "",
+        use_mcts: bool = False,
+    ) -> Dict[str, Any]:
+        return self.client.post(
+            "/play",
+            data={
+                "cell": str(cell),
+                "board_state": json.dumps(board_state),
+                "game_id": game_id,
+                "board_size": "3",
+                "mcts_iterations": "50",
+                "use_mcts": "true" if use_mcts else "false",
+            },
+        ).get_json()
+
+    def test_homepage_caches_no_game(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.client.get("/").status_code, 200)
+        self.assertEqual(routes.games, {})
+
+    def test_move_for_uncached_game(self) -> None:
+        # e.g. the move reached another gunicorn worker: the game is rebuilt
+        # from the client's board rather than being thrown away
+        game_id = self.play(1, [[0, 0, 0], [0, 0, 0], [0, 0, 0]])["game_id"]
+        routes.games.clear()
+        response = self.play(2, [[1, 0, 0], [0, -1, 0], [0, 0, 0]], game_id)
+        self.assertEqual(response["game_id"], game_id)
+        # The AI blocks the player's top row
+        self.assertEqual(response["ai_cell"], 3)
+        self.assertEqual(
+            routes.games[game_id].board.state,
+            [[1, 1, -1], [0, -1, 0], [0, 0, 0]],
+        )
+
+    def test_use_mcts_on_3x3(self) -> None:
+        # 3x3 boards are solved exactly unless MCTS is asked for, so only
+        # then is a search tree built
+        empty = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        for use_mcts in (False, True):
+            game_id = self.play(1, empty, use_mcts=use_mcts)["game_id"]
+            self.assertEqual(
+                routes.games[game_id].mcts.tree_size > 0, use_mcts
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()